@@ -3,46 +3,166 @@
 Deploy script for Digital Evidence smart contract
 
 Requirements:
-    pip install vyper web3 python-dotenv
+    pip install vyper web3 python-dotenv orjson
 
 Usage:
-    python scripts/deploy.py
+    python scripts/deploy.py [--pretty]
+
+    --pretty  Write contractABI.json indented (default: compact)
+
+Environment:
+    BLOCKCHAIN_RPC_URL            http(s):// or ws(s):// endpoint. WebSocket
+                                  endpoints wait for receipts on newHeads
+                                  instead of polling.
+    BLOCKCHAIN_POLL_LATENCY       Seconds between receipt polls (default: 1.0).
+                                  Use ~0.5 on a local dev chain; 2-5 on public
+                                  RPCs to avoid hammering the node or hitting
+                                  rate limits.
+    BLOCKCHAIN_MAX_FEE_GWEI       EIP-1559 max fee per gas (default: 50)
+    BLOCKCHAIN_PRIORITY_FEE_GWEI  EIP-1559 priority fee per gas (default: 2),
+                                  at most BLOCKCHAIN_MAX_FEE_GWEI
 """
 
+import asyncio
+import hashlib
 import json
 import os
+import re
+import shutil
+import sys
 from pathlib import Path
-from web3 import Web3
-from dotenv import load_dotenv
+import orjson
+from rpc import async_connect, async_wait_for_receipt, fee_params
 
-# Load environment variables
-load_dotenv()
+# Compilation artifact cache
+CACHE_DIR = Path(__file__).parent.parent / '.vyper_cache'
 
-def compile_contract(contract_path):
+# Compiler flags, part of the cache key
+VYPER_FLAGS = ['--evm-version', 'istanbul']
+
+def vyper_version():
+    """
+    Installed vyper version, read from package metadata so a cache hit
+    doesn't spawn the compiler. Falls back to 'vyper --version' when vyper
+    isn't installed as a Python package (e.g. a standalone binary).
+    """
+    from importlib.metadata import PackageNotFoundError, version
+
+    try:
+        return version('vyper')
+    except PackageNotFoundError:
+        import subprocess
+
+        return subprocess.check_output(['vyper', '--version']).decode('utf-8').strip()
+
+def artifact_path(contract_path):
+    """
+    Cache file for a contract, keyed by the SHA-256 of the compiler
+    version, the compiler flags and the source, so upgrading vyper or
+    changing flags never reuses stale bytecode
+    """
+    key = hashlib.sha256()
+    key.update(vyper_version().encode())
+    key.update(' '.join(VYPER_FLAGS).encode())
+    key.update(Path(contract_path).read_bytes())
+    return CACHE_DIR / f'{key.hexdigest()}.json'
+
+def save_artifact(cache_path, artifact):
+    """Write a compilation artifact to the cache"""
+    CACHE_DIR.mkdir(exist_ok=True)
+    write_atomic(cache_path, json.dumps(artifact).encode())
+
+def compile_contract(contract_path, cache_path):
     """
     Compile Vyper contract using vyper command
-    Returns ABI and bytecode
+    Returns the artifact with ABI and bytecode (plus gas_used once the
+    contract has been deployed)
+
+    Artifacts are cached in .vyper_cache/ (see artifact_path), so repeat
+    deploys of an unchanged contract skip compilation.
     """
     print(f"📝 Compiling contract: {contract_path}")
 
+    if cache_path.exists():
+        with open(cache_path, 'r') as f:
+            artifact = json.load(f)
+        print("✅ Using cached compilation artifact")
+        return artifact
+
     # Compile contract
     import subprocess
 
-    # Get ABI
-    abi_output = subprocess.check_output(['vyper', '-f', 'abi', '--evm-version', 'istanbul', contract_path])
-    abi = json.loads(abi_output)
+    # Get ABI and bytecode from a single compiler run (one line per format)
+    output = subprocess.check_output(['vyper', '-f', 'abi,bytecode', *VYPER_FLAGS, str(contract_path)])
+    abi_line, bytecode_line = output.decode('utf-8').strip().splitlines()
+    artifact = {
+        'abi': json.loads(abi_line),
+        'bytecode': bytecode_line,
+    }
 
-    # Get bytecode
-    bytecode_output = subprocess.check_output(['vyper', '-f', 'bytecode', '--evm-version', 'istanbul', contract_path])
-    bytecode = bytecode_output.decode('utf-8').strip()
+    save_artifact(cache_path, artifact)
 
     print("✅ Contract compiled successfully")
-    return abi, bytecode
+    return artifact
+
+def prepare_artifact(contract_path):
+    """Look up or build the artifact of a contract, returns (cache_path, artifact)"""
+    cache_path = artifact_path(contract_path)
+    return cache_path, compile_contract(contract_path, cache_path)
+
+def write_atomic(path, data):
+    """
+    Write bytes through a temporary file swapped in with os.replace, so
+    readers never see a partial write. An existing file keeps its mode,
+    and the temporary file is private while the data is written.
+    """
+    tmp_path = path.with_name(path.name + '.tmp')
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'wb') as f:
+        f.write(data)
+
+    if path.exists():
+        shutil.copymode(path, tmp_path)
+    os.replace(tmp_path, path)
+
+def save_env_value(env_path, key, value):
+    """
+    Set KEY=value in a .env file, replacing an existing entry or appending one.
+    Returns False when the entry already had this value and nothing was written.
+    """
+    data = env_path.read_bytes() if env_path.exists() else b''
+    new_line = f'{key}={value}'.encode()
+    pattern = re.compile(rb'^' + re.escape(key.encode()) + rb'=[^\r\n]*', re.M)
+
+    match = pattern.search(data)
+    if match and match.group(0) == new_line:
+        return False
+
+    if match:
+        data = pattern.sub(lambda _: new_line, data, count=1)
+    else:
+        newline = b'\r\n' if b'\r\n' in data else b'\n'
+        if data and not data.endswith(b'\n'):
+            data += newline
+        data += new_line + newline
+
+    write_atomic(env_path, data)
+    return True
 
-def deploy_contract():
+async def deploy_contract_async(pretty=False):
     """
     Deploy the Digital Evidence smart contract
+
+    Runs on AsyncWeb3 so the compiler runs in a worker thread while the
+    chain state is fetched. The ABI is written compact unless pretty is set
     """
+    import aiohttp
+    from dotenv import load_dotenv
+    from web3.exceptions import ProviderConnectionError
+
+    # Load environment variables
+    load_dotenv()
+
     print("\n" + "="*60)
     print("🚀 Digital Evidence Contract Deployment")
     print("="*60 + "\n")
@@ -58,27 +178,56 @@ def deploy_contract():
 
     # Connect to blockchain
     print(f"🔗 Connecting to: {rpc_url}")
-    w3 = Web3(Web3.HTTPProvider(rpc_url))
 
-    if not w3.is_connected():
+    connection_errors = (
+        aiohttp.ClientConnectionError, asyncio.TimeoutError, ConnectionError, ProviderConnectionError,
+    )
+
+    try:
+        w3 = await async_connect(rpc_url)
+    except connection_errors:
         print("❌ Error: Could not connect to blockchain")
         return
 
-    print(f"✅ Connected to network (Chain ID: {w3.eth.chain_id})")
-
-    # Load account
-    account = w3.eth.account.from_key(private_key)
+    try:
+        # Load account
+        account = w3.eth.account.from_key(private_key)
+
+        # The compiler is a blocking subprocess, so it runs in the default
+        # executor while the chain state requests are in flight
+        contract_path = Path(__file__).parent.parent / 'contracts' / 'DigitalEvidence.vy'
+        compiled = asyncio.get_running_loop().run_in_executor(None, prepare_artifact, contract_path)
+
+        # This is the first RPC, so it also tells us whether the node is reachable
+        try:
+            chain_id, balance, nonce = await asyncio.gather(
+                w3.eth.chain_id,
+                w3.eth.get_balance(account.address),
+                w3.eth.get_transaction_count(account.address),
+            )
+        except connection_errors:
+            compiled.cancel()
+            print("❌ Error: Could not connect to blockchain")
+            return
+
+        cache_path, artifact = await compiled
+
+        await run_deployment(w3, account, chain_id, balance, nonce, cache_path, artifact, pretty)
+    finally:
+        await w3.provider.disconnect()
+
+async def run_deployment(w3, account, chain_id, balance, nonce, cache_path, artifact, pretty):
+    """Deploy the compiled contract over an open connection and save the results"""
+    from web3.exceptions import TimeExhausted
+
+    print(f"✅ Connected to network (Chain ID: {chain_id})")
     print(f"📍 Deployer address: {account.address}")
-
-    balance = w3.eth.get_balance(account.address)
     print(f"💰 Balance: {w3.from_wei(balance, 'ether')} ETH")
 
     if balance == 0:
         print("⚠️  Warning: Account balance is 0. Deployment may fail.")
 
-    # Compile contract
-    contract_path = Path(__file__).parent.parent / 'contracts' / 'DigitalEvidence.vy'
-    abi, bytecode = compile_contract(contract_path)
+    abi, bytecode = artifact['abi'], artifact['bytecode']
 
     # Create contract instance
     Contract = w3.eth.contract(abi=abi, bytecode=bytecode)
@@ -86,35 +235,44 @@ def deploy_contract():
     # Build transaction
     print("\n📦 Building deployment transaction...")
 
-    nonce = w3.eth.get_transaction_count(account.address)
-
-    # Estimate gas
-    gas_estimate = Contract.constructor().estimate_gas({
-        'from': account.address
-    })
-
-    print(f"⛽ Estimated gas: {gas_estimate}")
+    if 'gas_used' in artifact:
+        # Same source deployed before, reuse its gas usage
+        gas = int(artifact['gas_used'] * 1.25)  # Add 25% buffer
+        print(f"⛽ Gas from previous deployment: {artifact['gas_used']}")
+    else:
+        # Estimate gas
+        gas_estimate = await Contract.constructor().estimate_gas({
+            'from': account.address
+        })
+        gas = int(gas_estimate * 1.2)  # Add 20% buffer
+        print(f"⛽ Estimated gas: {gas_estimate}")
 
     # Build transaction
-    transaction = Contract.constructor().build_transaction({
+    transaction = await Contract.constructor().build_transaction({
         'from': account.address,
         'nonce': nonce,
-        'gas': int(gas_estimate * 1.2),  # Add 20% buffer
-        'gasPrice': w3.eth.gas_price,
+        'gas': gas,
+        'chainId': chain_id,
+        **fee_params(),
     })
 
     # Sign transaction
     print("✍️  Signing transaction...")
-    signed_txn = w3.eth.account.sign_transaction(transaction, private_key)
+    signed_txn = w3.eth.account.sign_transaction(transaction, account.key)
 
     # Send transaction
     print("📤 Sending transaction...")
-    tx_hash = w3.eth.send_raw_transaction(signed_txn.raw_transaction)
+    tx_hash = await w3.eth.send_raw_transaction(signed_txn.raw_transaction)
     print(f"⏳ Transaction hash: {tx_hash.hex()}")
 
     # Wait for confirmation
     print("⏳ Waiting for confirmation...")
-    tx_receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+    try:
+        tx_receipt = await async_wait_for_receipt(w3, tx_hash)
+    except (TimeExhausted, asyncio.TimeoutError):
+        print("\n⏱️  Timed out waiting for the deployment receipt")
+        print(f"   The transaction was sent and may still be mined: {tx_hash.hex()}")
+        return
 
     if tx_receipt.status == 1:
         print("\n" + "="*60)
@@ -125,37 +283,23 @@ def deploy_contract():
         print(f"⛽ Gas Used: {tx_receipt.gasUsed}")
         print(f"📦 Block Number: {tx_receipt.blockNumber}")
 
+        # Remember gas usage so the next deploy can skip estimation
+        artifact['gas_used'] = tx_receipt.gasUsed
+        save_artifact(cache_path, artifact)
+
         # Save contract address to .env file
         print("\n💾 Saving contract address to backend/.env...")
         env_path = Path(__file__).parent.parent / 'backend' / '.env'
 
-        # Read existing .env or create new
-        env_lines = []
-        if env_path.exists():
-            with open(env_path, 'r') as f:
-                env_lines = f.readlines()
-
-        # Update or add CONTRACT_ADDRESS
-        found = False
-        for i, line in enumerate(env_lines):
-            if line.startswith('CONTRACT_ADDRESS='):
-                env_lines[i] = f'CONTRACT_ADDRESS={tx_receipt.contractAddress}\n'
-                found = True
-                break
-
-        if not found:
-            env_lines.append(f'CONTRACT_ADDRESS={tx_receipt.contractAddress}\n')
-
-        with open(env_path, 'w') as f:
-            f.writelines(env_lines)
-
-        print("✅ Contract address saved to backend/.env")
+        if save_env_value(env_path, 'CONTRACT_ADDRESS', tx_receipt.contractAddress):
+            print("✅ Contract address saved to backend/.env")
+        else:
+            print("✅ backend/.env already up to date")
 
         # Save ABI to backend
         print("\n💾 Saving ABI to backend/src/config/contractABI.json...")
         abi_path = Path(__file__).parent.parent / 'backend' / 'src' / 'config' / 'contractABI.json'
-        with open(abi_path, 'w') as f:
-            json.dump(abi, f, indent=2)
+        abi_path.write_bytes(orjson.dumps(abi, option=orjson.OPT_INDENT_2 if pretty else 0))
         print("✅ ABI saved")
 
         print("\n🎉 Deployment complete!")
@@ -169,9 +313,18 @@ def deploy_contract():
         print("\n❌ Deployment failed!")
         print(f"Transaction receipt: {tx_receipt}")
 
+        # The cached gas usage may be what ran the deployment out of gas,
+        # so the next deploy estimates afresh
+        if artifact.pop('gas_used', None) is not None:
+            save_artifact(cache_path, artifact)
+
+def deploy_contract(pretty=False):
+    """Synchronous entry point, runs deploy_contract_async to completion"""
+    asyncio.run(deploy_contract_async(pretty))
+
 if __name__ == '__main__':
     try:
-        deploy_contract()
+        deploy_contract(pretty='--pretty' in sys.argv[1:])
     except Exception as e:
         print(f"\n❌ Error: {e}")
         import traceback
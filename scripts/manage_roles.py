@@ -11,17 +11,29 @@ Usage:
 
     # Check role
     python scripts/manage_roles.py check 0xADDRESS police
+
+    # Check all roles for several addresses
+    python scripts/manage_roles.py check-many 0xADDRESS 0xADDRESS
+
+Environment:
+    BLOCKCHAIN_RPC_URL            http(s):// or ws(s):// endpoint. WebSocket
+                                  endpoints wait for receipts on newHeads
+                                  instead of polling.
+    BLOCKCHAIN_POLL_LATENCY       Seconds between receipt polls (default: 1.0).
+                                  Lower it on local chains, raise it (2-5) on
+                                  public RPCs that rate-limit.
+    BLOCKCHAIN_MAX_FEE_GWEI       EIP-1559 max fee per gas (default: 50)
+    BLOCKCHAIN_PRIORITY_FEE_GWEI  EIP-1559 priority fee per gas (default: 2),
+                                  at most BLOCKCHAIN_MAX_FEE_GWEI
 """
 
+import contextlib
+import functools
 import json
 import os
 import sys
 from pathlib import Path
-from web3 import Web3
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
+from rpc import connect, fee_params, wait_for_receipt, wait_for_receipts
 
 # Role definitions
 ROLES = {
@@ -31,8 +43,46 @@ ROLES = {
     'judge': 8,
 }
 
+# Precomputed views of ROLES for bitmap checks
+_ROLE_MASK = sum(ROLES.values())
+_ROLES_TUPLE = tuple(ROLES.items())
+
+# Multicall3 is deployed at the same address on most EVM chains
+MULTICALL3_ADDRESS = '0xcA11bde05977b3631167028862bE2a173976CA11'
+MULTICALL3_ABI = [{
+    'name': 'aggregate3',
+    'type': 'function',
+    'stateMutability': 'payable',
+    'inputs': [{
+        'name': 'calls',
+        'type': 'tuple[]',
+        'components': [
+            {'name': 'target', 'type': 'address'},
+            {'name': 'allowFailure', 'type': 'bool'},
+            {'name': 'callData', 'type': 'bytes'},
+        ],
+    }],
+    'outputs': [{
+        'name': 'returnData',
+        'type': 'tuple[]',
+        'components': [
+            {'name': 'success', 'type': 'bool'},
+            {'name': 'returnData', 'type': 'bytes'},
+        ],
+    }],
+}]
+
+@functools.lru_cache(maxsize=1)
 def load_contract():
-    """Load contract instance"""
+    """
+    Load contract instance (cached for the lifetime of the process)
+    Returns the (w3, contract, account) context passed to every command
+    """
+    from dotenv import load_dotenv
+
+    # Load environment variables
+    load_dotenv()
+
     rpc_url = os.getenv('BLOCKCHAIN_RPC_URL', 'http://127.0.0.1:8545')
     contract_address = os.getenv('CONTRACT_ADDRESS')
     private_key = os.getenv('PRIVATE_KEY')
@@ -46,10 +96,7 @@ def load_contract():
         sys.exit(1)
 
     # Connect
-    w3 = Web3(Web3.HTTPProvider(rpc_url))
-    if not w3.is_connected():
-        print("❌ Error: Could not connect to blockchain")
-        sys.exit(1)
+    w3 = connect(rpc_url)
 
     # Load ABI
     abi_path = Path(__file__).parent.parent / 'backend' / 'src' / 'config' / 'contractABI.json'
@@ -64,8 +111,106 @@ def load_contract():
 
     return w3, contract, account
 
-def grant_role(address, role_name):
-    """Grant role to address"""
+@contextlib.contextmanager
+def first_rpc():
+    """
+    Report an unreachable node on a command's first RPC. There is no
+    upfront connectivity probe, so only the first call is wrapped: later
+    failures may come after a transaction was already broadcast.
+    """
+    import requests
+
+    try:
+        yield
+    except (requests.exceptions.ConnectionError, requests.exceptions.Timeout, ConnectionError):
+        print("❌ Error: Could not connect to blockchain")
+        sys.exit(1)
+
+class NonceManager:
+    """
+    Hands out sequential nonces for an account from a local counter,
+    so back-to-back transactions don't each need an eth_getTransactionCount
+    """
+
+    def __init__(self, w3, address):
+        self.w3 = w3
+        self.address = address
+        self.next_nonce = None
+        self.chain_id = None
+
+    def sync(self):
+        """Resync the counter from the node's pending transaction count"""
+        self.next_nonce = self.w3.eth.get_transaction_count(self.address, 'pending')
+
+    def next(self):
+        """Return the next nonce and advance the counter"""
+        if self.next_nonce is None:
+            self.sync()
+        nonce = self.next_nonce
+        self.next_nonce += 1
+        return nonce
+
+def chain_id_for(nonces):
+    """
+    Return the chain ID, cached on the nonce manager. It is fetched once,
+    in the same batched round trip that seeds the nonce counter if needed.
+    """
+    if nonces.chain_id is not None:
+        return nonces.chain_id
+
+    w3 = nonces.w3
+    with w3.batch_requests() as batch:
+        batch.add(w3.eth.chain_id)
+        if nonces.next_nonce is None:
+            batch.add(w3.eth.get_transaction_count(nonces.address, 'pending'))
+        results = batch.execute()
+
+    nonces.chain_id = results[0]
+    if len(results) == 2:
+        nonces.next_nonce = results[1]
+
+    return nonces.chain_id
+
+def is_nonce_error(error):
+    """Check whether an RPC error was caused by a stale nonce"""
+    message = str(error).lower()
+    return 'nonce too low' in message or 'nonce too high' in message
+
+def send_role_tx(w3, account, function_call, nonces):
+    """
+    Build, sign and send a role transaction using the local nonce counter.
+    On a nonce mismatch the counter is resynced from 'pending' and the
+    transaction is retried once.
+    """
+    from web3.exceptions import Web3RPCError
+
+    with first_rpc():
+        chain_id = chain_id_for(nonces)
+
+    for attempt in range(2):
+        # Build transaction
+        tx = function_call.build_transaction({
+            'from': account.address,
+            'nonce': nonces.next(),
+            'gas': 200000,
+            'chainId': chain_id,
+            **fee_params(),
+        })
+
+        # Sign and send
+        signed_tx = w3.eth.account.sign_transaction(tx, account.key)
+        try:
+            return w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+        except Web3RPCError as e:
+            if attempt or not is_nonce_error(e):
+                # The nonce was never used, so don't leave a gap for the next tx
+                nonces.next_nonce = None
+                raise
+            print("⚠️  Nonce out of sync, resyncing and retrying...")
+            nonces.sync()
+
+def grant_role(ctx, address, role_name, nonces=None):
+    """Grant role to a checksummed address"""
     if role_name not in ROLES:
         print(f"❌ Invalid role: {role_name}")
         print(f"   Available roles: {', '.join(ROLES.keys())}")
@@ -75,32 +220,25 @@ def grant_role(address, role_name):
 
     print(f"🔐 Granting {role_name.upper()} role to {address}")
 
-    w3, contract, account = load_contract()
+    w3, contract, account = ctx
 
-    # Build transaction
-    tx = contract.functions.grant_role(address, role_value).build_transaction({
-        'from': account.address,
-        'nonce': w3.eth.get_transaction_count(account.address),
-        'gas': 200000,
-        'gasPrice': w3.eth.gas_price,
-    })
+    if nonces is None:
+        nonces = NonceManager(w3, account.address)
 
-    # Sign and send
-    signed_tx = w3.eth.account.sign_transaction(tx, account.key)
-    tx_hash = w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+    tx_hash = send_role_tx(w3, account, contract.functions.grant_role(address, role_value), nonces)
 
     print(f"⏳ Transaction sent: {tx_hash.hex()}")
 
     # Wait for receipt
-    receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+    receipt = wait_for_receipt(w3, tx_hash)
 
     if receipt.status == 1:
         print(f"✅ Role granted successfully!")
     else:
         print(f"❌ Transaction failed")
 
-def revoke_role(address, role_name):
-    """Revoke role from address"""
+def revoke_role(ctx, address, role_name, nonces=None):
+    """Revoke role from a checksummed address"""
     if role_name not in ROLES:
         print(f"❌ Invalid role: {role_name}")
         print(f"   Available roles: {', '.join(ROLES.keys())}")
@@ -110,32 +248,104 @@ def revoke_role(address, role_name):
 
     print(f"🔓 Revoking {role_name.upper()} role from {address}")
 
-    w3, contract, account = load_contract()
+    w3, contract, account = ctx
 
-    # Build transaction
-    tx = contract.functions.revoke_role(address, role_value).build_transaction({
-        'from': account.address,
-        'nonce': w3.eth.get_transaction_count(account.address),
-        'gas': 200000,
-        'gasPrice': w3.eth.gas_price,
-    })
+    if nonces is None:
+        nonces = NonceManager(w3, account.address)
 
-    # Sign and send
-    signed_tx = w3.eth.account.sign_transaction(tx, account.key)
-    tx_hash = w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+    tx_hash = send_role_tx(w3, account, contract.functions.revoke_role(address, role_value), nonces)
 
     print(f"⏳ Transaction sent: {tx_hash.hex()}")
 
     # Wait for receipt
-    receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+    receipt = wait_for_receipt(w3, tx_hash)
 
     if receipt.status == 1:
         print(f"✅ Role revoked successfully!")
     else:
         print(f"❌ Transaction failed")
 
-def check_role(address, role_name):
-    """Check if address has role"""
+def grant_roles_bulk(ctx, pairs, nonces=None):
+    """
+    Grant roles to many addresses at once.
+
+    pairs is an iterable of (checksummed address, role_name). All transactions are
+    signed up front with consecutive local nonces, submitted in a single
+    raw batched request, and the receipts of the accepted ones are polled together - one
+    eth_getTransactionReceipt batch per tick - so they can be mined in
+    parallel instead of one block each.
+    """
+    from hexbytes import HexBytes
+
+    pairs = list(pairs)
+    for address, role_name in pairs:
+        if role_name not in ROLES:
+            print(f"❌ Invalid role: {role_name}")
+            print(f"   Available roles: {', '.join(ROLES.keys())}")
+            sys.exit(1)
+
+    print(f"🔐 Granting {len(pairs)} roles")
+    if not pairs:
+        return
+
+    w3, contract, account = ctx
+
+    if nonces is None:
+        nonces = NonceManager(w3, account.address)
+
+    with first_rpc():
+        chain_id = chain_id_for(nonces)
+
+    # Build and sign all transactions with consecutive nonces
+    signed_txs = [
+        w3.eth.account.sign_transaction(
+            contract.functions.grant_role(address, ROLES[role_name]).build_transaction({
+                'from': account.address,
+                'nonce': nonces.next(),
+                'gas': 200000,
+                'chainId': chain_id,
+                **fee_params(),
+            }),
+            account.key,
+        )
+        for address, role_name in pairs
+    ]
+
+    # Submit everything in one HTTP request. web3's batch_requests() refuses
+    # eth_sendRawTransaction, so the raw provider batch is used instead.
+    responses = w3.provider.make_batch_request([
+        ('eth_sendRawTransaction', [signed_tx.raw_transaction.to_0x_hex()])
+        for signed_tx in signed_txs
+    ])
+
+    # A rejected tx leaves a nonce gap, so accepted txs after it stay queued
+    sent = []
+    gap = False
+    for (address, role_name), response in zip(pairs, responses):
+        if 'error' in response:
+            print(f"❌ {role_name.upper()} -> {address} rejected: {response['error'].get('message')}")
+            gap = True
+        elif gap:
+            print(f"⚠️  {role_name.upper()} -> {address}: {response['result']} queued behind a rejected transaction")
+        else:
+            print(f"⏳ {role_name.upper()} -> {address}: {response['result']}")
+            sent.append((address, role_name, HexBytes(response['result'])))
+
+    if gap:
+        # Point the counter back at the gap so the next transaction fills it
+        nonces.sync()
+
+    # Poll all receipts together
+    receipts = wait_for_receipts(w3, [tx_hash for _, _, tx_hash in sent])
+
+    for (address, role_name, _), receipt in zip(sent, receipts):
+        if receipt.status == 1:
+            print(f"✅ {role_name.upper()} granted to {address}")
+        else:
+            print(f"❌ Transaction failed for {address}")
+
+def check_role(ctx, address, role_name):
+    """Check if a checksummed address has role"""
     if role_name not in ROLES:
         print(f"❌ Invalid role: {role_name}")
         print(f"   Available roles: {', '.join(ROLES.keys())}")
@@ -143,33 +353,91 @@ def check_role(address, role_name):
 
     role_value = ROLES[role_name]
 
-    w3, contract, account = load_contract()
+    w3, contract, account = ctx
 
-    has_role = contract.functions.has_role(address, role_value).call()
+    with first_rpc():
+        has_role = contract.functions.has_role(address, role_value).call()
 
     if has_role:
         print(f"✅ {address} HAS {role_name.upper()} role")
     else:
         print(f"❌ {address} does NOT have {role_name.upper()} role")
 
-def check_all_roles(address):
-    """Check all roles for address"""
-    w3, contract, account = load_contract()
-
-    roles_bitmap = contract.functions.roles(address).call()
-
+def print_roles(address, roles_bitmap):
+    """Print the active roles in a roles bitmap"""
     print(f"\n📋 Roles for {address}:")
     print(f"   Raw bitmap: {roles_bitmap}")
     print("\n   Active roles:")
 
-    has_any = False
-    for role_name, role_value in ROLES.items():
-        if roles_bitmap & role_value:
+    active = roles_bitmap & _ROLE_MASK
+    if not active:
+        print(f"   ❌ No roles assigned")
+        return
+
+    for role_name, role_value in _ROLES_TUPLE:
+        if active & role_value:
             print(f"   ✅ {role_name.upper()}")
-            has_any = True
 
-    if not has_any:
-        print(f"   ❌ No roles assigned")
+def check_all_roles(ctx, address):
+    """Check all roles for a checksummed address"""
+    w3, contract, account = ctx
+
+    with first_rpc():
+        roles_bitmap = contract.functions.roles(address).call()
+
+    print_roles(address, roles_bitmap)
+
+def check_many(ctx, addresses):
+    """
+    Check all roles for several addresses with a single eth_call,
+    aggregating the roles(address) lookups through Multicall3
+    """
+    from web3.exceptions import BadFunctionCallOutput
+
+    w3, contract, account = ctx
+
+    multicall = w3.eth.contract(address=MULTICALL3_ADDRESS, abi=MULTICALL3_ABI)
+    calls = [
+        (contract.address, False, contract.encode_abi('roles', args=[address]))
+        for address in addresses
+    ]
+
+    try:
+        with first_rpc():
+            results = multicall.functions.aggregate3(calls).call()
+        bitmaps = [w3.codec.decode(['uint256'], return_data)[0] for _, return_data in results]
+    except BadFunctionCallOutput:
+        # Multicall3 is not deployed on this chain (e.g. a fresh dev node),
+        # fall back to one batched request carrying every roles() call
+        with w3.batch_requests() as batch:
+            for address in addresses:
+                batch.add(contract.functions.roles(address).call())
+            bitmaps = batch.execute()
+
+    for address, roles_bitmap in zip(addresses, bitmaps):
+        print_roles(address, roles_bitmap)
+
+def parse_address(value):
+    """
+    Validate a command line address and return it checksummed, so invalid
+    input fails before any RPC and ABI encoding doesn't re-checksum it.
+    All-lowercase or all-uppercase hex is normalized; mixed case must
+    already carry a valid EIP-55 checksum, as it likely holds a typo otherwise.
+    """
+    from web3 import Web3
+
+    try:
+        address = Web3.to_checksum_address(value)
+    except ValueError:
+        print(f"❌ Invalid address: {value}")
+        sys.exit(1)
+
+    digits = value[2:] if value[:2] in ('0x', '0X') else value
+    if digits != digits.lower() and digits != digits.upper() and digits != address[2:]:
+        print(f"❌ Invalid address checksum: {value}")
+        sys.exit(1)
+
+    return address
 
 def main():
     if len(sys.argv) < 2:
@@ -178,6 +446,7 @@ def main():
         print("  Revoke role:  python scripts/manage_roles.py revoke 0xADDRESS police")
         print("  Check role:   python scripts/manage_roles.py check 0xADDRESS police")
         print("  Check all:    python scripts/manage_roles.py check 0xADDRESS")
+        print("  Check many:   python scripts/manage_roles.py check-many 0xADDRESS 0xADDRESS ...")
         print("\nAvailable roles: admin, police, lab, judge")
         sys.exit(1)
 
@@ -187,28 +456,38 @@ def main():
         if len(sys.argv) != 4:
             print("Usage: python scripts/manage_roles.py grant 0xADDRESS role")
             sys.exit(1)
-        grant_role(sys.argv[2], sys.argv[3].lower())
+        handler, args = grant_role, (parse_address(sys.argv[2]), sys.argv[3].lower())
 
     elif command == 'revoke':
         if len(sys.argv) != 4:
             print("Usage: python scripts/manage_roles.py revoke 0xADDRESS role")
             sys.exit(1)
-        revoke_role(sys.argv[2], sys.argv[3].lower())
+        handler, args = revoke_role, (parse_address(sys.argv[2]), sys.argv[3].lower())
 
     elif command == 'check':
         if len(sys.argv) == 3:
-            check_all_roles(sys.argv[2])
+            handler, args = check_all_roles, (parse_address(sys.argv[2]),)
         elif len(sys.argv) == 4:
-            check_role(sys.argv[2], sys.argv[3].lower())
+            handler, args = check_role, (parse_address(sys.argv[2]), sys.argv[3].lower())
         else:
             print("Usage: python scripts/manage_roles.py check 0xADDRESS [role]")
             sys.exit(1)
 
+    elif command == 'check-many':
+        if len(sys.argv) < 3:
+            print("Usage: python scripts/manage_roles.py check-many 0xADDRESS [0xADDRESS ...]")
+            sys.exit(1)
+        handler, args = check_many, ([parse_address(address) for address in sys.argv[2:]],)
+
     else:
         print(f"❌ Unknown command: {command}")
-        print("Available commands: grant, revoke, check")
+        print("Available commands: grant, revoke, check, check-many")
         sys.exit(1)
 
+    # Connect once, after the arguments are known to be valid
+    ctx = load_contract()
+    handler(ctx, *args)
+
 if __name__ == '__main__':
     try:
         main()
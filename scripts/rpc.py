@@ -0,0 +1,200 @@
+"""
+Shared RPC helpers for the deploy and role management scripts
+
+Provides provider selection based on the RPC URL scheme and receipt
+waiting that reacts to new blocks instead of polling where possible:
+
+    http(s)://  HTTP provider, receipts are polled every
+                BLOCKCHAIN_POLL_LATENCY seconds (default: 1.0)
+    ws(s)://    WebSocket provider, receipts are checked once per
+                block announced on a newHeads subscription
+
+web3 and requests are imported inside the helpers so that importing this
+module stays cheap for script paths that never touch the network.
+"""
+
+import os
+import sys
+import time
+from decimal import Decimal, InvalidOperation
+
+TX_TIMEOUT = 300
+HTTP_TIMEOUT = 30
+
+def poll_latency():
+    """Seconds between receipt polls on HTTP providers"""
+    return float(os.getenv('BLOCKCHAIN_POLL_LATENCY', '1.0'))
+
+def _fee_wei(name, default):
+    """Read a fee in gwei from the environment, exits on a malformed value"""
+    from web3 import Web3
+
+    value = os.getenv(name, default)
+    try:
+        fee = Decimal(value)
+    except InvalidOperation:
+        fee = None
+    if fee is None or not fee.is_finite() or fee < 0:
+        print(f"❌ Error: {name} must be a non-negative number of gwei, got {value!r}")
+        sys.exit(1)
+    return Web3.to_wei(fee, 'gwei')
+
+def fee_params():
+    """
+    EIP-1559 fee fields for a type-2 transaction, taken from the
+    environment so no eth_gasPrice lookup is needed
+    """
+    max_fee = _fee_wei('BLOCKCHAIN_MAX_FEE_GWEI', '50')
+    priority_fee = _fee_wei('BLOCKCHAIN_PRIORITY_FEE_GWEI', '2')
+
+    # Nodes reject a priority fee above the max fee
+    if priority_fee > max_fee:
+        print("❌ Error: BLOCKCHAIN_PRIORITY_FEE_GWEI cannot be higher than BLOCKCHAIN_MAX_FEE_GWEI")
+        sys.exit(1)
+
+    return {
+        'type': 2,
+        'maxFeePerGas': max_fee,
+        'maxPriorityFeePerGas': priority_fee,
+    }
+
+def is_websocket(rpc_url):
+    """Check whether the RPC URL uses a WebSocket scheme"""
+    return rpc_url.startswith(('ws://', 'wss://'))
+
+def connect(rpc_url):
+    """Create a Web3 instance with the provider matching the URL scheme"""
+    import requests
+    from requests.adapters import HTTPAdapter
+    from web3 import Web3
+
+    if is_websocket(rpc_url):
+        from web3 import LegacyWebSocketProvider
+
+        return Web3(LegacyWebSocketProvider(rpc_url))
+
+    # Keep-alive session so repeated RPCs reuse the TCP/TLS connection
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+
+    return Web3(Web3.HTTPProvider(
+        rpc_url, session=session, request_kwargs={'timeout': HTTP_TIMEOUT}
+    ))
+
+def wait_for_receipt(w3, tx_hash):
+    """Wait for a single transaction receipt"""
+    if is_websocket(w3.provider.endpoint_uri):
+        return wait_for_receipts(w3, [tx_hash])[0]
+
+    return w3.eth.wait_for_transaction_receipt(
+        tx_hash, timeout=TX_TIMEOUT, poll_latency=poll_latency()
+    )
+
+def wait_for_receipts(w3, tx_hashes):
+    """Wait for several transaction receipts, returned in the same order"""
+    if not tx_hashes:
+        return []
+
+    if is_websocket(w3.provider.endpoint_uri):
+        # The sync WebSocket provider cannot subscribe, so the wait runs
+        # on a short-lived async connection to the same endpoint
+        import asyncio
+
+        return asyncio.run(asyncio.wait_for(
+            _wait_via_subscription(w3.provider.endpoint_uri, tx_hashes),
+            TX_TIMEOUT,
+        ))
+
+    return _wait_via_polling(w3, tx_hashes)
+
+def _wait_via_polling(w3, tx_hashes):
+    """Poll receipts with one batched request per tick"""
+    pending = {tx_hash.to_0x_hex() for tx_hash in tx_hashes}
+    deadline = time.monotonic() + TX_TIMEOUT
+
+    while pending:
+        # Raw batch, so receipts still pending come back as null instead of raising
+        checking = list(pending)
+        responses = w3.provider.make_batch_request(
+            [('eth_getTransactionReceipt', [tx_hash]) for tx_hash in checking]
+        )
+        for tx_hash, response in zip(checking, responses):
+            if response.get('result'):
+                pending.discard(tx_hash)
+
+        if pending:
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"{len(pending)} transactions not mined after {TX_TIMEOUT}s")
+            time.sleep(poll_latency())
+
+    # Everything is mined, fetch the formatted receipts in one batch
+    with w3.batch_requests() as batch:
+        for tx_hash in tx_hashes:
+            batch.add(w3.eth.get_transaction_receipt(tx_hash))
+        return batch.execute()
+
+async def _wait_via_subscription(ws_url, tx_hashes):
+    """Open a WebSocket connection and wait for receipts on newHeads"""
+    from web3 import AsyncWeb3, WebSocketProvider
+
+    async with AsyncWeb3(WebSocketProvider(ws_url)) as w3:
+        return await _wait_on_new_heads(w3, tx_hashes)
+
+async def _wait_on_new_heads(w3, tx_hashes):
+    """Check pending receipts once per block announced via newHeads"""
+    import asyncio
+
+    from web3.exceptions import TransactionNotFound
+
+    receipts = {}
+
+    async def fetch(tx_hash):
+        try:
+            receipts[tx_hash] = await w3.eth.get_transaction_receipt(tx_hash)
+        except TransactionNotFound:
+            pass
+
+    async def check_pending():
+        # All pending receipts are requested concurrently on the socket
+        await asyncio.gather(*(fetch(tx_hash) for tx_hash in tx_hashes if tx_hash not in receipts))
+        return len(receipts) == len(tx_hashes)
+
+    subscription_id = await w3.eth.subscribe('newHeads')
+
+    # Transactions may already be mined before the subscription started
+    if not await check_pending():
+        async for _ in w3.socket.process_subscriptions():
+            if await check_pending():
+                break
+
+    await w3.eth.unsubscribe(subscription_id)
+
+    return [receipts[tx_hash] for tx_hash in tx_hashes]
+
+async def async_connect(rpc_url):
+    """Create a connected AsyncWeb3 instance with the provider matching the URL scheme"""
+    import aiohttp
+    from web3 import AsyncWeb3, AsyncHTTPProvider, WebSocketProvider
+
+    if is_websocket(rpc_url):
+        return await AsyncWeb3(WebSocketProvider(rpc_url))
+
+    # aiohttp keeps the connection alive across requests on its own
+    return AsyncWeb3(AsyncHTTPProvider(
+        rpc_url, request_kwargs={'timeout': aiohttp.ClientTimeout(total=HTTP_TIMEOUT)}
+    ))
+
+async def async_wait_for_receipt(w3, tx_hash):
+    """Wait for a single transaction receipt on an AsyncWeb3 instance"""
+    import asyncio
+
+    if is_websocket(w3.provider.endpoint_uri):
+        # Persistent connection, so subscribe on it directly
+        receipts = await asyncio.wait_for(_wait_on_new_heads(w3, [tx_hash]), TX_TIMEOUT)
+        return receipts[0]
+
+    return await w3.eth.wait_for_transaction_receipt(
+        tx_hash, timeout=TX_TIMEOUT, poll_latency=poll_latency()
+    )
@@ -0,0 +1,61 @@
+import os
+import stat
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts'))
+
+import deploy  # noqa: E402
+
+ADDRESS = '0x5FbDB2315678afecb367f032d93F642f64180aa3'
+
+
+def test_save_env_value_replaces_an_existing_entry(tmp_path):
+    env_path = tmp_path / '.env'
+    env_path.write_bytes(b'PORT=3000\nCONTRACT_ADDRESS=0xold\nIPFS_URL=http://ipfs\n')
+
+    assert deploy.save_env_value(env_path, 'CONTRACT_ADDRESS', ADDRESS)
+
+    assert env_path.read_bytes() == f'PORT=3000\nCONTRACT_ADDRESS={ADDRESS}\nIPFS_URL=http://ipfs\n'.encode()
+
+
+def test_save_env_value_appends_a_missing_entry(tmp_path):
+    env_path = tmp_path / '.env'
+    env_path.write_bytes(b'PORT=3000')
+
+    assert deploy.save_env_value(env_path, 'CONTRACT_ADDRESS', ADDRESS)
+
+    assert env_path.read_bytes() == f'PORT=3000\nCONTRACT_ADDRESS={ADDRESS}\n'.encode()
+
+
+def test_save_env_value_leaves_an_up_to_date_file_alone(tmp_path):
+    env_path = tmp_path / '.env'
+    env_path.write_bytes(f'CONTRACT_ADDRESS={ADDRESS}\n'.encode())
+    os.utime(env_path, ns=(0, 0))
+
+    assert not deploy.save_env_value(env_path, 'CONTRACT_ADDRESS', ADDRESS)
+
+    assert env_path.stat().st_mtime_ns == 0
+    assert not (tmp_path / '.env.tmp').exists()
+
+
+def test_save_env_value_keeps_crlf_line_endings(tmp_path):
+    env_path = tmp_path / '.env'
+    env_path.write_bytes(b'CONTRACT_ADDRESS=0xold\r\nPORT=3000\r\n')
+
+    deploy.save_env_value(env_path, 'CONTRACT_ADDRESS', ADDRESS)
+    deploy.save_env_value(env_path, 'IPFS_URL', 'http://ipfs')
+
+    assert env_path.read_bytes() == f'CONTRACT_ADDRESS={ADDRESS}\r\nPORT=3000\r\nIPFS_URL=http://ipfs\r\n'.encode()
+
+
+def test_write_atomic_keeps_the_mode_of_the_replaced_file(tmp_path):
+    env_path = tmp_path / '.env'
+    env_path.write_bytes(b'PRIVATE_KEY=0xsecret\n')
+    env_path.chmod(0o600)
+
+    deploy.write_atomic(env_path, b'PRIVATE_KEY=0xother\n')
+
+    assert env_path.read_bytes() == b'PRIVATE_KEY=0xother\n'
+    assert stat.S_IMODE(env_path.stat().st_mode) == 0o600
+    assert not (tmp_path / '.env.tmp').exists()
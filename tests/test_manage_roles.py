@@ -0,0 +1,143 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+from eth_account import Account
+from web3 import Web3
+from web3.providers import JSONBaseProvider
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts'))
+
+import manage_roles  # noqa: E402
+
+ABI_PATH = Path(__file__).parent.parent / 'backend' / 'src' / 'config' / 'contractABI.json'
+CONTRACT_ADDRESS = '0x5FbDB2315678afecb367f032d93F642f64180aa3'
+CHAIN_ID = 31337
+
+
+class FakeNode(JSONBaseProvider):
+    """In-memory JSON-RPC node answering the calls grant_roles_bulk makes"""
+
+    endpoint_uri = 'http://fake-node'
+
+    def __init__(self, reject=()):
+        super().__init__()
+        self.reject = set(reject)
+        self.batches = []
+        self.mined = {}
+        self.sent = 0
+
+    def handle(self, method, params):
+        if method == 'eth_chainId':
+            return {'result': hex(CHAIN_ID)}
+        if method == 'eth_getTransactionCount':
+            return {'result': hex(len(self.mined))}
+        if method == 'eth_sendRawTransaction':
+            index = self.sent
+            self.sent += 1
+            if index in self.reject:
+                return {'error': {'code': -32000, 'message': 'insufficient funds'}}
+            tx_hash = Web3.keccak(hexstr=params[0]).to_0x_hex()
+            self.mined[tx_hash] = index
+            return {'result': tx_hash}
+        if method == 'eth_getTransactionReceipt':
+            if params[0] not in self.mined:
+                return {'result': None}
+            return {'result': {
+                'transactionHash': params[0],
+                'transactionIndex': hex(self.mined[params[0]]),
+                'blockNumber': '0x1',
+                'status': '0x1',
+                'gasUsed': hex(50000),
+                'logs': [],
+            }}
+        raise AssertionError(f"unexpected RPC {method}")
+
+    def make_request(self, method, params):
+        return {'jsonrpc': '2.0', 'id': 0, **self.handle(method, params)}
+
+    def make_batch_request(self, requests):
+        self.batches.append([method for method, _ in requests])
+        return [
+            {'jsonrpc': '2.0', 'id': i, **self.handle(method, params)}
+            for i, (method, params) in enumerate(requests)
+        ]
+
+
+@pytest.fixture
+def ctx_for():
+    def build(node):
+        w3 = Web3(node)
+        with open(ABI_PATH) as f:
+            contract = w3.eth.contract(address=CONTRACT_ADDRESS, abi=json.load(f))
+        return w3, contract, Account.from_key('0x' + '11' * 32)
+    return build
+
+
+def test_grant_roles_bulk_sends_all_transactions_in_one_batch(ctx_for, capsys):
+    node = FakeNode()
+    pairs = [(Account.create().address, 'police') for _ in range(3)]
+
+    manage_roles.grant_roles_bulk(ctx_for(node), pairs)
+
+    send_batches = [b for b in node.batches if 'eth_sendRawTransaction' in b]
+    assert send_batches == [['eth_sendRawTransaction'] * 3]
+    assert len(node.mined) == 3
+    assert capsys.readouterr().out.count('POLICE granted') == 3
+
+
+def test_grant_roles_bulk_keeps_hashes_around_a_rejected_transaction(ctx_for, capsys):
+    node = FakeNode(reject={1})
+    pairs = [(Account.create().address, 'lab') for _ in range(3)]
+
+    manage_roles.grant_roles_bulk(ctx_for(node), pairs)
+
+    out = capsys.readouterr().out
+    assert f"LAB granted to {pairs[0][0]}" in out
+    assert f"LAB -> {pairs[1][0]} rejected: insufficient funds" in out
+    assert f"LAB -> {pairs[2][0]}" in out and 'queued behind a rejected transaction' in out
+
+
+def test_grant_roles_bulk_with_first_transaction_rejected(ctx_for, capsys):
+    node = FakeNode(reject={0, 1})
+    pairs = [(Account.create().address, 'judge') for _ in range(2)]
+
+    manage_roles.grant_roles_bulk(ctx_for(node), pairs)
+
+    out = capsys.readouterr().out
+    assert out.count('rejected: insufficient funds') == 2
+    assert 'granted' not in out
+    assert not any('eth_getTransactionReceipt' in b for b in node.batches)
+
+
+def test_grant_roles_bulk_with_no_pairs(ctx_for):
+    node = FakeNode()
+
+    manage_roles.grant_roles_bulk(ctx_for(node), [])
+
+    assert node.batches == []
+
+
+def test_send_role_tx_reuses_the_nonce_of_a_rejected_transaction(ctx_for):
+    from web3.exceptions import Web3RPCError
+
+    node = FakeNode(reject={0})
+    w3, contract, account = ctx_for(node)
+    nonces = manage_roles.NonceManager(w3, account.address)
+    grant = contract.functions.grant_role(Account.create().address, manage_roles.ROLES['lab'])
+
+    with pytest.raises(Web3RPCError):
+        manage_roles.send_role_tx(w3, account, grant, nonces)
+    manage_roles.send_role_tx(w3, account, grant, nonces)
+
+    assert nonces.next_nonce == 1
+
+
+def test_parse_address_normalizes_single_case_and_rejects_bad_checksums(capsys):
+    assert manage_roles.parse_address(CONTRACT_ADDRESS.lower()) == CONTRACT_ADDRESS
+    assert manage_roles.parse_address('0x' + CONTRACT_ADDRESS[2:].upper()) == CONTRACT_ADDRESS
+
+    with pytest.raises(SystemExit):
+        manage_roles.parse_address(CONTRACT_ADDRESS[:-2] + 'A3')
+    assert 'Invalid address checksum' in capsys.readouterr().out